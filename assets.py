@@ -0,0 +1,193 @@
+"""Pre-resized image renditions for the story's photos and club logos.
+
+Each source image is encoded once per width in WIDTHS as WebP and JPEG into
+static/renditions/, which Streamlit serves directly (enableStaticServing in
+.streamlit/config.toml). Filenames carry a hash of the source so browsers
+can cache them indefinitely. The app embeds them with a <picture> srcset so
+phones download the small rendition. Encoded bytes and markup are memoized
+in-process; run `python assets.py` to build everything ahead of time. If
+static/renditions/ cannot be written, a hero image falls back to a single
+inlined (data URI) rendition.
+"""
+import base64
+import hashlib
+import html
+import io
+import os
+import threading
+
+import instrumentation
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RENDITION_DIR = os.path.join(HERE, "static", "renditions")
+STATIC_URL = "app/static/renditions"
+HERO_IMAGES = ("pep_guardiola.jpg", "phil_foden.jpg", "josko_gvardiol.jpg")
+WIDTHS = (480, 960, 1440)
+# Streamlit's main column is ~704px wide on desktop
+SIZES = "(max-width: 736px) 100vw, 704px"
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 6}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+_lock = threading.Lock()
+_renditions = {}
+_bytes = {}
+_html = {}
+
+
+def _source_path(source):
+    return source if os.path.isabs(source) else os.path.join(HERE, source)
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def encode(image, width, fmt):
+    """Resize `image` to `width` (never upscaling) and encode it as `fmt`."""
+    pil_format, _, options = FORMATS[fmt]
+    with instrumentation.timer(f"assets.encode.{fmt}"):
+        return _encode(image, width, pil_format, options)
+
+
+def _encode(image, width, pil_format, options):
+    from PIL import Image
+
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=pil_format, **options)
+    return buffer.getvalue()
+
+
+def _build(path, formats):
+    from PIL import Image
+
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        widths = sorted({*(w for w in WIDTHS if w < image.width), min(image.width, WIDTHS[-1])})
+        height_ratio = image.height / image.width
+        os.makedirs(RENDITION_DIR, exist_ok=True)
+        files = []
+        for fmt in formats:
+            for width in widths:
+                name = f"{stem}-{digest}-{width}.{fmt}"
+                target = os.path.join(RENDITION_DIR, name)
+                if not os.path.exists(target):
+                    with open(target + ".tmp", "wb") as f:
+                        f.write(encode(image, width, fmt))
+                    os.replace(target + ".tmp", target)
+                files.append((fmt, width, name))
+    return {"files": files, "height_ratio": height_ratio}
+
+
+def renditions(source, formats=("webp", "jpeg")):
+    """Build (if needed) and describe the renditions of `source`."""
+    path = _source_path(source)
+    key = (path, formats)
+    current = _stamp(path)
+    cached = _renditions.get(key)
+    instrumentation.count("assets.renditions", hit=cached is not None and cached[0] == current)
+    if cached is None or cached[0] != current:
+        with _lock:
+            cached = _renditions.get(key)
+            if cached is None or cached[0] != current:
+                cached = (current, _build(path, formats))
+                _renditions[key] = cached
+    return cached[1]
+
+
+def rendition_bytes(source, width, fmt="webp"):
+    """Encoded bytes of `source` at `width`, cached in-process."""
+    path = _source_path(source)
+    key = (path, width, fmt)
+    current = _stamp(path)
+    cached = _bytes.get(key)
+    instrumentation.count("assets.bytes", hit=cached is not None and cached[0] == current)
+    if cached is None or cached[0] != current:
+        from PIL import Image
+
+        with Image.open(path) as image:
+            cached = (current, encode(image, width, fmt))
+        _bytes[key] = cached
+    return cached[1]
+
+
+def data_uri(source, width, fmt="webp"):
+    mimetype = FORMATS[fmt][1]
+    return f"data:{mimetype};base64," + base64.b64encode(rendition_bytes(source, width, fmt)).decode()
+
+
+def picture_html(source, caption):
+    """Responsive <picture> markup for a hero image, full column width."""
+    path = _source_path(source)
+    key = (path, caption)
+    current = _stamp(path)
+    cached = _html.get(key)
+    hit = cached is not None and cached[0] == current
+    instrumentation.count("assets.html", hit=hit)
+    if hit:
+        return cached[1]
+
+    alt = html.escape(caption)
+    try:
+        info = renditions(source)
+    except OSError:
+        # Read-only deploy where `python assets.py` was not run: inline one rendition instead
+        markup = _inline_figure(source, alt)
+        _html[key] = (current, markup)
+        return markup
+
+    srcsets = {}
+    for fmt, width, name in info["files"]:
+        srcsets.setdefault(fmt, []).append(f"{STATIC_URL}/{name} {width}w")
+    largest = max(width for _, width, _ in info["files"])
+    fallback = next(name for fmt, width, name in info["files"] if fmt == "jpeg" and width == min(largest, 960))
+    markup = _figure(
+        "<picture>"
+        f"<source type='image/webp' srcset='{', '.join(srcsets['webp'])}' sizes='{SIZES}'>"
+        f"<img src='{STATIC_URL}/{fallback}' srcset='{', '.join(srcsets['jpeg'])}' sizes='{SIZES}' "
+        f"width='{largest}' height='{round(largest * info['height_ratio'])}' alt='{alt}' loading='lazy' "
+        "style='width: 100%; height: auto;'>"
+        "</picture>",
+        alt,
+    )
+    _html[key] = (current, markup)
+    return markup
+
+
+def _figure(image_markup, alt):
+    return (
+        f"<figure style='margin: 0 0 1rem 0;'>{image_markup}"
+        f"<figcaption style='text-align: center; font-size: 14px; opacity: 0.6;'>{alt}</figcaption></figure>"
+    )
+
+
+def _inline_figure(source, alt):
+    from PIL import Image
+
+    with Image.open(_source_path(source)) as image:
+        width = min(image.width, WIDTHS[1])
+        height = round(image.height * width / image.width)
+    return _figure(
+        f"<img src='{data_uri(source, width)}' width='{width}' height='{height}' alt='{alt}' "
+        "style='width: 100%; height: auto;'>",
+        alt,
+    )
+
+
+def build_all():
+    for source in HERO_IMAGES:
+        renditions(source)
+
+
+if __name__ == "__main__":
+    build_all()
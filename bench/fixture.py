@@ -0,0 +1,98 @@
+"""Deterministic stand-in for the Kaggle dataset, for benchmarks.
+
+Writes the six CSVs app.py reads with the same columns and value formats
+as the Kaggle export (20 clubs, a 380-match double round robin with
+scores like "2_1" and "0 _ 3"), then ingests them into a snapshot store.
+The numbers are synthetic, so benchmarks run offline and reproducibly.
+"""
+import csv
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEAMS = [
+    "Manchester City", "Arsenal", "Liverpool", "Aston Villa", "Tottenham Hotspur",
+    "Chelsea", "Newcastle United", "Manchester United", "West Ham United", "Crystal Palace",
+    "Brighton & Hove Albion", "AFC Bournemouth", "Fulham", "Wolverhampton Wanderers", "Everton",
+    "Brentford", "Nottingham Forest", "Luton Town", "Burnley", "Sheffield United",
+]
+
+
+def _write(path, header, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def write_dataset(target, seed=2324):
+    rng = random.Random(seed)
+
+    pairs = [(home, away) for home in TEAMS for away in TEAMS if home != away]
+    rng.shuffle(pairs)
+    kickoff = datetime(2023, 8, 11, 19)
+    matches = []
+    for i, (home, away) in enumerate(pairs):
+        round_ = i // 10 + 1
+        when = kickoff + timedelta(days=7 * (round_ - 1), hours=i % 10)
+        home_goals, away_goals = rng.randint(0, 4), rng.randint(0, 3)
+        score = f"{home_goals}_{away_goals}" if i % 3 else f"{home_goals} _ {away_goals}"
+        matches.append([
+            round_, round_, home, away, when.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            True, True, False, False, score, "Full-Time", "", "",
+        ])
+    _write(
+        os.path.join(target, "matches_23_24.csv"),
+        ["Round", "Round Name", "Home Team", "Away Team", "UTC Time", "Finished", "Started",
+         "Cancelled", "Awarded", "Score", "Match Status", "Unnamed: 11", "Unnamed: 12"],
+        matches,
+    )
+
+    _write(
+        os.path.join(target, "pl_table_2023_24.csv"),
+        ["idx", "name", "played", "wins", "draws", "losses", "scoresStr", "goalConDiff", "pts"],
+        [[i + 1, team, 38, 28 - i, 5, 5 + i, f"{90 - 2 * i}-{30 + 2 * i}", 60 - 4 * i, 89 - 3 * i]
+         for i, team in enumerate(TEAMS)],
+    )
+    _write(
+        os.path.join(target, "pl_table_xg_2023_24.csv"),
+        ["idx", "name", "played", "xg", "xgConceded", "xPoints", "xgDiff", "xgConcededDiff", "pts"],
+        [[i + 1, team, 38, round(rng.uniform(39, 90), 4), round(rng.uniform(28, 80), 4),
+          round(rng.uniform(30, 82), 4), round(rng.uniform(-15, 14), 4), round(rng.uniform(-12, 26), 4), 89 - 3 * i]
+         for i, team in enumerate(TEAMS)],
+    )
+
+    players = [(f"{team.split()[0]} Player {n}", team) for team in TEAMS for n in range(5)]
+    _write(
+        os.path.join(target, "Premleg_23_24", "player_top_scorers.csv"),
+        ["Rank", "Player", "Team", "Goals", "Matches", "Country"],
+        [[i + 1, player, team, max(1, 27 - i // 3), 35, "England"] for i, (player, team) in enumerate(players)],
+    )
+    rng.shuffle(players)
+    _write(
+        os.path.join(target, "Premleg_23_24", "player_total_assists_in_attack.csv"),
+        ["Rank", "Player", "Team", "Chances Created", "Chances Created per 90", "Matches", "Country"],
+        [[i + 1, player, team, 110 - i, round((110 - i) / 34, 2), 35, "England"] for i, (player, team) in enumerate(players)],
+    )
+    _write(
+        os.path.join(target, "Premleg_23_24", "possession_percentage_team.csv"),
+        ["Rank", "Team", "Possession (%)", "Matches", "Country"],
+        [[i + 1, team, round(65.1 - i * 1.2, 1), 38, "England"] for i, team in enumerate(TEAMS)],
+    )
+    return target
+
+
+def prepare_store(workdir):
+    """Write the fixture under `workdir`, ingest it and point this process at the store."""
+    store = os.path.join(workdir, "snapshots")
+    os.environ["STD_SNAPSHOT_DIR"] = store
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import snapshot
+
+    snapshot.ingest(write_dataset(os.path.join(workdir, "dataset")), store=store)
+    return store
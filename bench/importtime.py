@@ -0,0 +1,119 @@
+"""Import-time report for the app's startup path, checked against a budget.
+
+Imports the modules app.py imports at top level in a fresh interpreter
+under `python -X importtime`, parses the per-module timings, and fails if
+the median total exceeds the budget or if a module the app should only
+load lazily (pandas, plotly.express, ...) shows up at startup.
+
+    python bench/importtime.py [--runs 5] [--json report.json]
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+BUDGET = os.path.join(ROOT, "bench", "importtime_budget.json")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def startup_modules(path=APP):
+    """Top-level imports of the app script, in source order."""
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return modules
+
+
+def parse(stderr):
+    """{module: (self_us, cumulative_us)} and the total of top-level cumulative times."""
+    modules = {}
+    total_us = 0
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        modules[name] = (self_us, cumulative_us)
+        if len(indent) == 1:
+            total_us += cumulative_us
+    return modules, total_us
+
+
+def measure(modules):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    code = "\n".join(f"import {name}" for name in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return parse(result.stderr)
+
+
+def report(runs=5, budget_path=BUDGET):
+    with open(budget_path) as f:
+        budget = json.load(f)
+    modules = startup_modules()
+    totals = []
+    for _ in range(runs):
+        timings, total_us = measure(modules)
+        totals.append(total_us)
+
+    # Roots of the import tree (top-level packages), by cumulative time of the last run
+    packages = {}
+    for name, (_, cumulative_us) in timings.items():
+        root = name.split(".")[0]
+        packages[root] = max(packages.get(root, 0), cumulative_us)
+    forbidden = sorted(
+        name for name in budget.get("forbidden", [])
+        if any(loaded == name or loaded.startswith(name + ".") for loaded in timings)
+    )
+    total_ms = statistics.median(totals) / 1000
+    return {
+        "modules": modules,
+        "runs": runs,
+        "total_ms": round(total_ms, 1),
+        "budget_ms": budget["total_ms"],
+        "slowest_packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda item: -item[1])[:15]
+        },
+        "forbidden_loaded": forbidden,
+        "ok": total_ms <= budget["total_ms"] and not forbidden,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the app's startup import time against a budget.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", default=BUDGET)
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    result = report(args.runs, args.budget)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+    print(f"startup imports: {', '.join(result['modules'])}")
+    print(f"median total over {result['runs']} runs: {result['total_ms']} ms (budget {result['budget_ms']} ms)")
+    for name, ms in result["slowest_packages_ms"].items():
+        print(f"  {ms:8.1f} ms  {name}")
+    if result["forbidden_loaded"]:
+        print("loaded at startup but should be lazy: " + ", ".join(result["forbidden_loaded"]))
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
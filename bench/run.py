@@ -0,0 +1,190 @@
+"""Headless latency and memory benchmarks for app.py.
+
+Drives the script with streamlit.testing's AppTest against the synthetic
+fixture dataset (bench/fixture.py), in a fresh interpreter so the first
+run is a true cold start:
+
+- cold_start_ms: median over --cold-runs fresh processes of the first run
+  (imports, data and chart caches empty)
+- warm_rerun_ms: median of full reruns once caches are warm
+- fragment_ms: median time of the opponent_matches fragment after selecting
+  each opponent in the selectbox, summarized as fragment_median_ms /
+  fragment_max_ms
+- peak_rss_mb: peak resident memory of the benchmark process
+
+AppTest reruns the whole script on a widget change, so the wall time of a
+selection is just another full rerun. fragment_ms is therefore read from
+the fragment's own `section.opponent_matches` timer. Instrumentation is
+switched on only for that phase, after the cold and warm runs, and a run
+fails if the fragment did not execute.
+
+Results are written as JSON. With a stored baseline, any metric in GATED
+more than --threshold above it fails the run (exit code 1). fragment_max_ms
+is reported but not gated: it is the worst of the per-opponent medians, so
+one slow sample would decide it. The committed
+baseline was recorded on a dev machine; refresh it with --update-baseline
+on the machine that runs the check.
+
+    python bench/run.py [--output bench-results.json] [--baseline bench/baseline.json]
+    python bench/run.py --update-baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH)
+APP = os.path.join(ROOT, "app.py")
+BASELINE = os.path.join(BENCH, "baseline.json")
+# Medians (and peak memory); maxima and per-opponent timings are informational
+GATED = ("cold_start_ms", "warm_rerun_ms", "fragment_median_ms", "peak_rss_mb")
+FRAGMENT_TIMER = "section.opponent_matches"
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def _cold_start(timeout):
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=timeout).run()
+    cold = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at, cold
+
+
+def measure(warm_runs, switch_runs, timeout=120):
+    """Run inside the benchmark child process; STD_SNAPSHOT_DIR must already point at a store."""
+    import resource
+
+    at, cold = _cold_start(timeout)
+
+    warm = []
+    for _ in range(warm_runs):
+        start = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - start)
+
+    import instrumentation
+
+    # app.py re-applies its section decorators on every run, so this takes effect on the next one
+    instrumentation.enabled = True
+    fragment = {}
+    for opponent in list(at.selectbox[0].options):
+        samples = []
+        for _ in range(switch_runs):
+            # Select away and back so every sample is a real change of value
+            at.selectbox[0].select(opponent).run()
+            other = next(o for o in at.selectbox[0].options if o != opponent)
+            at.selectbox[0].select(other).run()
+            instrumentation.reset()
+            at.selectbox[0].select(opponent).run()
+            timer = instrumentation.snapshot()["timers"].get(FRAGMENT_TIMER)
+            if timer is None:
+                raise RuntimeError(f"{FRAGMENT_TIMER} did not run; is opponent_matches still a section?")
+            samples.append(timer["last_s"])
+        fragment[opponent] = _ms(statistics.median(samples))
+
+    # ru_maxrss is in KiB on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {
+        "cold_start_ms": _ms(cold),
+        "warm_rerun_ms": _ms(statistics.median(warm)),
+        "fragment_ms": fragment,
+        "fragment_median_ms": statistics.median(fragment.values()),
+        "fragment_max_ms": max(fragment.values()),
+        "peak_rss_mb": round(peak_rss / 2**20, 1),
+    }
+
+
+def run(warm_runs=10, switch_runs=5, cold_runs=3):
+    """Prepare the fixture store, then measure in fresh interpreters."""
+    sys.path.insert(0, BENCH)
+    import fixture
+
+    with tempfile.TemporaryDirectory(prefix="std-bench-") as workdir:
+        store = fixture.prepare_store(workdir)
+        # Build the derived data and renditions the way a deploy would, outside the timed process
+        subprocess.run(
+            [sys.executable, "-c", "import datastore, derived, assets; datastore.build_all(); derived.build_all(); assets.build_all()"],
+            cwd=ROOT, env=dict(os.environ, STD_SNAPSHOT_DIR=store), check=True,
+        )
+        results = _child(store, "--child", str(warm_runs), str(switch_runs))
+        # Further cold starts only; one fresh process is a single, noisy sample
+        cold = [results["cold_start_ms"]]
+        cold += [_child(store, "--cold")["cold_start_ms"] for _ in range(cold_runs - 1)]
+    results["cold_start_runs_ms"] = cold
+    results["cold_start_ms"] = statistics.median(cold)
+    return results
+
+
+def _child(store, *args):
+    child = subprocess.run(
+        [sys.executable, __file__, *args],
+        cwd=ROOT, env=dict(os.environ, STD_SNAPSHOT_DIR=store), check=True,
+        capture_output=True, text=True,
+    )
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """Gated metrics that exceed their baseline by more than `threshold` (a fraction)."""
+    regressions = {}
+    for metric in GATED:
+        value, reference = results.get(metric), baseline.get(metric)
+        if value is not None and reference and value > reference * (1 + threshold):
+            regressions[metric] = {"baseline": reference, "value": value}
+    return regressions
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--child"]:
+        print(json.dumps(measure(int(argv[1]), int(argv[2]))))
+        return 0
+    if argv[:1] == ["--cold"]:
+        print(json.dumps({"cold_start_ms": _ms(_cold_start(timeout=120)[1])}))
+        return 0
+
+    parser = argparse.ArgumentParser(description="Benchmark cold/warm rerun latency and memory of app.py.")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed slowdown over baseline (0.3 = 30%%)")
+    parser.add_argument("--warm-runs", type=int, default=10)
+    parser.add_argument("--switch-runs", type=int, default=5)
+    parser.add_argument("--cold-runs", type=int, default=3, help="fresh processes to take the cold-start median over")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run(args.warm_runs, args.switch_runs, args.cold_runs)
+    regressions = {}
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    with open(args.output, "w") as f:
+        json.dump({"results": results, "threshold": args.threshold, "regressions": regressions}, f, indent=2)
+
+    print(f"cold start:    {results['cold_start_ms']:8.1f} ms median of {len(results['cold_start_runs_ms'])} processes")
+    print(f"warm rerun:    {results['warm_rerun_ms']:8.1f} ms")
+    print(f"fragment:      {results['fragment_median_ms']:8.1f} ms median, {results['fragment_max_ms']:.1f} ms max over {len(results['fragment_ms'])} opponents")
+    print(f"peak RSS:      {results['peak_rss_mb']:8.1f} MB")
+    for metric, r in regressions.items():
+        print(f"REGRESSION {metric}: {r['value']} vs baseline {r['baseline']}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Memory load test: N concurrent app sessions in one process.
+
+Each simulated session is a streamlit.testing AppTest that runs app.py
+once and then stays open, like a browser tab. RSS is sampled after every
+session; the per-session figure is the average growth after the first
+(warm-up) session, which should stay small because datasets, derived
+tables, figure specs and image bytes are shared process-wide.
+
+    python bench/sessions.py [--sessions 20] [--fixture] [--json sessions.json]
+
+Reads the dataset from the current snapshot (see STD_SNAPSHOT_DIR), or
+from the synthetic benchmark dataset with --fixture.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+
+def rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except FileNotFoundError:
+        # No procfs (macOS): fall back to peak RSS, reported in bytes there
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run(sessions, timeout=60):
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    from streamlit.testing.v1 import AppTest
+
+    gc.collect()
+    baseline = rss_bytes()
+    open_sessions = []
+    samples = []
+    for _ in range(sessions):
+        at = AppTest.from_file(APP, default_timeout=timeout).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        open_sessions.append(at)
+        gc.collect()
+        samples.append(rss_bytes())
+
+    per_session = (samples[-1] - samples[0]) / (sessions - 1) if sessions > 1 else 0
+    return {
+        "sessions": sessions,
+        "baseline_rss_mb": round(baseline / 2**20, 1),
+        "first_session_rss_mb": round((samples[0] - baseline) / 2**20, 1),
+        "rss_per_session_mb": round(per_session / 2**20, 2),
+        "final_rss_mb": round(samples[-1] / 2**20, 1),
+        "rss_mb": [round(s / 2**20, 1) for s in samples],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report RSS growth per simulated app session.")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--fixture", action="store_true", help="use the synthetic dataset from bench/fixture.py")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    if args.fixture:
+        import fixture
+
+        with tempfile.TemporaryDirectory(prefix="std-sessions-") as workdir:
+            fixture.prepare_store(workdir)
+            result = run(args.sessions)
+    else:
+        result = run(args.sessions)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+    print(f"baseline RSS:       {result['baseline_rss_mb']} MB")
+    print(f"first session:     +{result['first_session_rss_mb']} MB (loads shared data)")
+    print(f"per extra session: +{result['rss_per_session_mb']} MB over {result['sessions']} sessions")
+    print(f"final RSS:          {result['final_rss_mb']} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Typed, cached access to the dataset tables used by app.py.
+
+Each source CSV is converted once to a Parquet file next to it, with explicit
+dtypes (categoricals for team/player names, parsed UTC datetimes). The copy
+records a hash of the dtype spec and is re-converted when the spec changes.
+Loaded frames are memoized in-process and reloaded only when the source
+file's mtime or size changes, so a Streamlit rerun costs one os.stat per
+table.
+"""
+import hashlib
+import os
+import threading
+
+import instrumentation
+import snapshot
+
+# Explicit dtypes passed to read_csv; columns not listed keep pandas' inference
+DTYPES = {
+    "pl_table": {
+        "idx": "int16", "name": "category", "played": "int16", "wins": "int16", "draws": "int16",
+        "losses": "int16", "scoresStr": "string", "goalConDiff": "int16", "pts": "int16",
+    },
+    "xg_data": {
+        "idx": "int16", "name": "category", "played": "int16", "xg": "float64", "xgConceded": "float64",
+        "xPoints": "float64", "xgDiff": "float64", "xgConcededDiff": "float64", "pts": "int16",
+    },
+    "matches": {
+        "Round": "Int16", "Round Name": "category", "Home Team": "category", "Away Team": "category",
+        "Finished": "boolean", "Started": "boolean", "Cancelled": "boolean", "Awarded": "boolean",
+        "Score": "string", "Match Status": "category",
+    },
+    "top_scorers": {"Rank": "Int16", "Player": "category", "Team": "category", "Country": "category"},
+    "top_assists": {"Rank": "Int16", "Player": "category", "Team": "category", "Country": "category"},
+    "possession_data": {"Rank": "Int16", "Team": "category", "Possession (%)": "float64", "Country": "category"},
+}
+DATETIMES = {"matches": ["UTC Time"]}
+# Parquet metadata key holding the dtype spec a copy was converted with
+SCHEMA_KEY = b"std_schema"
+
+_cache = {}
+_lock = threading.Lock()
+_paths = None
+
+
+def paths():
+    global _paths
+    if _paths is None:
+        _paths = snapshot.resolve_paths()
+    return _paths
+
+
+def import_pandas():
+    import pandas as pd
+
+    # Loaded frames are shared by every session in the process. Under
+    # copy-on-write, a session that modifies the view it was handed gets a
+    # private copy instead of mutating the shared frame.
+    pd.options.mode.copy_on_write = True
+    return pd
+
+
+def view(df):
+    # Shallow copy: shares the shared frame's buffers until written to
+    return None if df is None else df.copy(deep=False)
+
+
+def _parquet_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def schema_version(name):
+    """Short hash of the table's DTYPES/DATETIMES; a Parquet copy made with another spec is stale."""
+    return hashlib.sha1(repr((DTYPES.get(name), DATETIMES.get(name))).encode()).hexdigest()[:12]
+
+
+def _read_csv(name, csv_path):
+    pd = import_pandas()
+    with instrumentation.timer(f"datastore.read_csv.{name}"):
+        df = pd.read_csv(csv_path, dtype=DTYPES.get(name))
+        # Trailing empty columns in the Kaggle export show up as "Unnamed: N"
+        df = df.drop(columns=[c for c in df.columns if c.startswith("Unnamed:")])
+        for col in DATETIMES.get(name, ()):
+            df[col] = pd.to_datetime(df[col], utc=True)
+    return df
+
+
+def convert(name, csv_path):
+    """Parse `csv_path` with the table's dtypes and write the Parquet copy."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = _read_csv(name, csv_path)
+    target = _parquet_path(csv_path)
+    tmp = target + ".tmp"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, SCHEMA_KEY: schema_version(name).encode()})
+    try:
+        pq.write_table(table, tmp)
+        os.replace(tmp, target)
+    except OSError:
+        # Read-only snapshot: serve the parsed frame, just without the on-disk copy
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return df
+
+
+def _is_current(name, parquet_path):
+    import pyarrow.parquet as pq
+
+    # Footer only; copies written before the key existed count as stale
+    metadata = pq.read_schema(parquet_path).metadata or {}
+    return metadata.get(SCHEMA_KEY) == schema_version(name).encode()
+
+
+def _load_uncached(name, csv_path):
+    pd = import_pandas()
+    parquet_path = _parquet_path(csv_path)
+    try:
+        if os.stat(parquet_path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns and _is_current(name, parquet_path):
+            with instrumentation.timer(f"datastore.read_parquet.{name}"):
+                return pd.read_parquet(parquet_path)
+    except FileNotFoundError:
+        pass
+    return convert(name, csv_path)
+
+
+def stamp(name):
+    """(mtime_ns, size) of the source file, or None if an optional source is missing."""
+    try:
+        st = os.stat(paths()[name])
+    except FileNotFoundError:
+        if name in snapshot.OPTIONAL:
+            return None
+        raise
+    return (st.st_mtime_ns, st.st_size)
+
+
+def data_version():
+    """Short hash identifying the current contents of every source file."""
+    stamps = [(name, stamp(name)) for name in sorted(paths())]
+    return hashlib.sha1(repr((os.path.dirname(paths()["matches"]), stamps)).encode()).hexdigest()[:12]
+
+
+def load(name):
+    """Return a copy-on-write view of table `name` (a key of snapshot.SOURCES).
+
+    None if the file is optional and missing.
+    """
+    csv_path = paths()[name]
+    current = stamp(name)
+    if current is None:
+        return None
+
+    cached = _cache.get(name)
+    if cached is not None and cached[0] == current:
+        instrumentation.count("datastore", hit=True)
+        return view(cached[1])
+    instrumentation.count("datastore", hit=False)
+    with _lock:
+        cached = _cache.get(name)
+        if cached is None or cached[0] != current:
+            cached = (current, _load_uncached(name, csv_path))
+            _cache[name] = cached
+    return view(cached[1])
+
+
+def build_all():
+    """Convert every available source to Parquet (e.g. right after `snapshot.py ingest`)."""
+    for name, csv_path in paths().items():
+        if os.path.exists(csv_path):
+            convert(name, csv_path)
+
+
+def clear():
+    global _paths
+    with _lock:
+        _cache.clear()
+        _paths = None
+
+
+if __name__ == "__main__":
+    build_all()
@@ -0,0 +1,206 @@
+"""Derived tables the story plots, materialized once per dataset version.
+
+Each table declares the source tables it is computed from. Built tables are
+written as Parquet to a `derived/` directory inside the snapshot, together
+with a manifest of the inputs' checksums and dtype specs and a hash of the
+code that built it; a table is rebuilt only when one of its inputs, their
+dtypes or its build code changes. Run `python derived.py` after ingesting a
+snapshot to build everything ahead of time.
+"""
+import hashlib
+import inspect
+import json
+import os
+import threading
+
+import datastore
+import instrumentation
+import snapshot
+
+MANIFEST = "manifest.json"
+
+
+def _points_table(xg_data):
+    return xg_data.sort_values(by="pts", ascending=False, kind="stable")
+
+
+def _clean_sheets(xg_data):
+    return _points_table(xg_data)[["name", "xgConceded"]].sort_values("xgConceded", kind="stable")
+
+
+def _city_scorers(top_scorers):
+    return top_scorers[top_scorers["Team"] == "Manchester City"]
+
+
+def _top_chances_created(top_scorers, top_assists):
+    top_scorers_assists = top_scorers.merge(top_assists, on="Player", suffixes=("_goals", "_assists"))
+    return top_scorers_assists.nlargest(10, "Chances Created")
+
+
+def _match_results(matches):
+    return matches.assign(Score=matches["Score"].str.replace("_", " : ").str.strip())
+
+
+def parse_goals(score):
+    """Home and away goals (columns 0 and 1) from scores like "2_1" / "0 _ 3"; NaN if unplayed."""
+    return score.str.extract(r"(\d+)\s*_\s*(\d+)")
+
+
+def _head_to_head(matches):
+    # Played matches only
+    goals = parse_goals(matches["Score"])
+    played = goals[0].notna()
+    h2h = _match_results(matches)[played][["Home Team", "Away Team", "UTC Time", "Score"]]
+    h2h["home_goals"] = goals.loc[played, 0].astype("int16")
+    h2h["away_goals"] = goals.loc[played, 1].astype("int16")
+
+    # Unordered pair key: team_a is the alphabetically first club
+    home = h2h["Home Team"].astype(str)
+    away = h2h["Away Team"].astype(str)
+    home_first = home <= away
+    h2h["team_a"] = home.where(home_first, away).astype("category")
+    h2h["team_b"] = away.where(home_first, home).astype("category")
+    h2h["a_goals"] = h2h["home_goals"].where(home_first, h2h["away_goals"])
+    h2h["b_goals"] = h2h["away_goals"].where(home_first, h2h["home_goals"])
+    return h2h.sort_values(["team_a", "team_b", "UTC Time"], kind="stable")
+
+
+# name -> (input source tables, build function taking those frames in order)
+TABLES = {
+    "points_table": (("xg_data",), _points_table),
+    "clean_sheets": (("xg_data",), _clean_sheets),
+    "city_scorers": (("top_scorers",), _city_scorers),
+    "top_chances_created": (("top_scorers", "top_assists"), _top_chances_created),
+    "head_to_head": (("matches",), _head_to_head),
+}
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def derived_dir():
+    return os.path.join(os.path.dirname(datastore.paths()["matches"]), "derived")
+
+
+def _read_manifest():
+    try:
+        with open(os.path.join(derived_dir(), MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_manifest(manifest):
+    path = os.path.join(derived_dir(), MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _code_version(build):
+    """Hash of the source of `build` and every function of this module it calls, transitively."""
+    seen = {}
+    pending = [build]
+    while pending:
+        fn = pending.pop()
+        if fn.__name__ in seen:
+            continue
+        seen[fn.__name__] = inspect.getsource(fn)
+        pending += [globals()[name] for name in fn.__code__.co_names if inspect.isfunction(globals().get(name))]
+    return hashlib.sha1("".join(seen[name] for name in sorted(seen)).encode()).hexdigest()[:12]
+
+
+def _fingerprint(source, known):
+    """Checksum of a source file, re-hashed only when its mtime or size moved."""
+    current = datastore.stamp(source)
+    if current is None:
+        return None
+    if known and (known["mtime_ns"], known["size"]) == current:
+        return known
+    return {
+        "mtime_ns": current[0],
+        "size": current[1],
+        "sha256": snapshot.file_sha256(datastore.paths()[source]),
+    }
+
+
+def _load_or_build(name):
+    pd = datastore.import_pandas()
+    inputs, build = TABLES[name]
+    manifest = _read_manifest()
+    entry = manifest.get(name, {})
+    known = entry.get("inputs", {})
+    fingerprints = {source: _fingerprint(source, known.get(source)) for source in inputs}
+    if any(fp is None for fp in fingerprints.values()):
+        return None
+
+    path = os.path.join(derived_dir(), name + ".parquet")
+    checksums = {source: fp["sha256"] for source, fp in fingerprints.items()}
+    code = _code_version(build)
+    # Inputs re-read with another dtype spec (see datastore.schema_version) can change the result too
+    schemas = {source: datastore.schema_version(source) for source in inputs}
+    if (
+        os.path.exists(path)
+        and entry.get("code") == code
+        and entry.get("schemas") == schemas
+        and checksums == {s: k.get("sha256") for s, k in known.items()}
+    ):
+        with instrumentation.timer(f"derived.read_parquet.{name}"):
+            df = pd.read_parquet(path)
+        if fingerprints == known:
+            return df
+    else:
+        frames = [datastore.load(source) for source in inputs]
+        with instrumentation.timer(f"derived.build.{name}"):
+            df = build(*frames)
+        try:
+            os.makedirs(derived_dir(), exist_ok=True)
+            df.to_parquet(path + ".tmp", index=False)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            # Read-only snapshot: keep the table in memory only
+            return df
+
+    manifest[name] = {"inputs": fingerprints, "code": code, "schemas": schemas}
+    try:
+        _write_manifest(manifest)
+    except OSError:
+        pass
+    return df
+
+
+def available(name):
+    """Whether every input of derived table `name` is present, without loading anything."""
+    return all(datastore.stamp(source) is not None for source in TABLES[name][0])
+
+
+def load(name):
+    """Return a copy-on-write view of derived table `name`, or None if one of its inputs is missing."""
+    inputs = TABLES[name][0]
+    current = tuple(datastore.stamp(source) for source in inputs)
+
+    cached = _cache.get(name)
+    if cached is not None and cached[0] == current:
+        instrumentation.count("derived", hit=True)
+        return datastore.view(cached[1])
+    instrumentation.count("derived", hit=False)
+    with _lock:
+        cached = _cache.get(name)
+        if cached is None or cached[0] != current:
+            cached = (current, _load_or_build(name))
+            _cache[name] = cached
+    return datastore.view(cached[1])
+
+
+def build_all():
+    for name in TABLES:
+        load(name)
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+
+
+if __name__ == "__main__":
+    build_all()
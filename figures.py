@@ -0,0 +1,119 @@
+"""Cache of serialized Plotly figure specs.
+
+`plotly_chart(chart_id, build)` calls `build()` only when there is no cached
+spec for (chart id, data version, params). On a hit the stored JSON spec is
+handed to the frontend as-is, skipping both figure construction and the
+validate/to_dict/to_json round trip that `st.plotly_chart` does per call.
+
+Emitting a stored spec relies on Streamlit internals, so it is only used on
+the Streamlit versions listed in STREAMLIT_VERSIONS. On any other version,
+or if those internals have moved, the spec is turned back into a figure
+and passed to `st.plotly_chart`, which is slower but always correct.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+import datastore
+import instrumentation
+
+MAXSIZE = 32
+# Defaults of st.plotly_chart, which the spec is rendered as
+CONFIG = json.dumps({"showLink": False, "linkText": False})
+SELECTION_MODE = ("points", "box", "lasso")
+# major.minor releases _enqueue was checked against
+STREAMLIT_VERSIONS = ("1.41",)
+
+_fast_path = st.__version__.rsplit(".", 1)[0] in STREAMLIT_VERSIONS
+
+
+class FigureCache:
+    """Thread-safe LRU of serialized figure specs, bounded to `maxsize` entries."""
+
+    def __init__(self, maxsize=MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+                self.hits += 1
+                instrumentation.count("figures", hit=True)
+                return spec
+            self.misses += 1
+        instrumentation.count("figures", hit=False)
+
+        import plotly.io
+
+        # Keys start with the chart id (see plotly_chart)
+        with instrumentation.timer(f"figures.build.{key[0]}"):
+            spec = plotly.io.to_json(build(), validate=False)
+        with self._lock:
+            self._specs[key] = spec
+            self._specs.move_to_end(key)
+            while len(self._specs) > self.maxsize:
+                self._specs.popitem(last=False)
+        return spec
+
+    def __len__(self):
+        return len(self._specs)
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+            self.hits = self.misses = 0
+
+
+cache = FigureCache()
+
+
+def _enqueue(spec, use_container_width):
+    # Same element st.plotly_chart emits for a non-selectable chart, minus the re-serialization
+    from streamlit.elements.lib.form_utils import current_form_id
+    from streamlit.elements.lib.utils import compute_and_register_element_id
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+
+    dg = st._main
+    proto = PlotlyChartProto()
+    proto.use_container_width = use_container_width
+    proto.theme = "streamlit"
+    proto.form_id = current_form_id(dg)
+    proto.spec = spec
+    proto.config = CONFIG
+    proto.id = compute_and_register_element_id(
+        "plotly_chart",
+        user_key=None,
+        form_id=proto.form_id,
+        plotly_spec=spec,
+        plotly_config=CONFIG,
+        selection_mode=SELECTION_MODE,
+        is_selection_activated=False,
+        theme="streamlit",
+        use_container_width=use_container_width,
+    )
+    dg._enqueue("plotly_chart", proto)
+
+
+def plotly_chart(chart_id, build, params=None, use_container_width=True):
+    """Render the figure returned by `build(**params)`, building it only on a cache miss."""
+    global _fast_path
+    params = params or {}
+    key = (chart_id, datastore.data_version(), tuple(sorted(params.items())))
+    spec = cache.get_or_build(key, lambda: build(**params))
+    if _fast_path:
+        try:
+            _enqueue(spec, use_container_width)
+            return
+        except (ImportError, AttributeError, TypeError):
+            # Internals moved in this Streamlit release; use the public API from now on
+            _fast_path = False
+    import plotly.io
+
+    st.plotly_chart(plotly.io.from_json(spec, skip_invalid=True), use_container_width=use_container_width)
@@ -0,0 +1,128 @@
+"""Head-to-head index over every pair of clubs in the season.
+
+The index maps an unordered team pair to its matches and to each side's
+aggregate record. It is built once per data version and shared by every
+session in the process; the rendered HTML block for a pair is memoized
+too, so switching opponents in the app is a dictionary lookup.
+"""
+import html
+import os
+import threading
+
+import assets
+import datastore
+import derived
+import instrumentation
+
+LOGO_DIR = os.path.join(assets.HERE, "logos")
+LOGO_WIDTH = 50
+
+_lock = threading.Lock()
+_state = {"version": None}
+
+
+def pair_key(team, opponent):
+    return tuple(sorted((team, opponent)))
+
+
+def build_index(h2h):
+    """Group the head-to-head table into {pair: {"matches": [...], "record": {team: {...}}}}."""
+    h2h = h2h.assign(
+        a_win=h2h["a_goals"] > h2h["b_goals"],
+        draw=h2h["a_goals"] == h2h["b_goals"],
+        b_win=h2h["a_goals"] < h2h["b_goals"],
+    )
+    totals = h2h.groupby(["team_a", "team_b"], observed=True)[["a_win", "draw", "b_win", "a_goals", "b_goals"]].sum()
+    rows = h2h[["team_a", "team_b", "Home Team", "Away Team", "UTC Time", "Score"]].to_dict("records")
+
+    index = {}
+    for (team_a, team_b), t in totals.iterrows():
+        index[(team_a, team_b)] = {
+            "matches": [],
+            "record": {
+                team_a: {"W": int(t.a_win), "D": int(t.draw), "L": int(t.b_win), "GF": int(t.a_goals), "GA": int(t.b_goals)},
+                team_b: {"W": int(t.b_win), "D": int(t.draw), "L": int(t.a_win), "GF": int(t.b_goals), "GA": int(t.a_goals)},
+            },
+        }
+    # Rows are already sorted by pair and kick-off time
+    for row in rows:
+        index[(row["team_a"], row["team_b"])]["matches"].append(row)
+    return index
+
+
+def _current():
+    global _state
+    version = datastore.data_version()
+    if _state["version"] != version:
+        with _lock:
+            if _state["version"] != version:
+                with instrumentation.timer("head_to_head.build_index"):
+                    index = build_index(derived.load("head_to_head"))
+                # Swapped in whole, so concurrent sessions never see a half-built state
+                _state = {
+                    "version": version,
+                    "index": index,
+                    "logos": load_logos({team for pair in index for team in pair}),
+                    "html": {},
+                }
+    return _state
+
+
+def teams():
+    """All clubs that appear in the index, sorted by name."""
+    return sorted({team for pair in _current()["index"] for team in pair})
+
+
+def lookup(team, opponent):
+    return _current()["index"].get(pair_key(team, opponent))
+
+
+def _logo_path(team):
+    return os.path.join(LOGO_DIR, team.replace(" ", "_").lower() + ".png")
+
+
+def load_logos(teams):
+    """Encode every available club logo once, as WebP data URIs for inline HTML."""
+    return {
+        team: assets.data_uri(_logo_path(team), LOGO_WIDTH * 2)
+        for team in teams
+        if os.path.exists(_logo_path(team))
+    }
+
+
+def _logo_tag(team, logos):
+    uri = logos.get(team)
+    return f"<img src='{uri}' width='{LOGO_WIDTH}'><br>" if uri else ""
+
+
+def _render(team, entry, logos):
+    cell = "text-align: center; vertical-align: middle; border: none;"
+    record = entry["record"][team]
+    parts = [
+        f"<p style='text-align: center;'><b>{html.escape(team)}</b>: "
+        f"{record['W']}W {record['D']}D {record['L']}L &middot; Goals {record['GF']} : {record['GA']}</p>",
+        "<table style='width: 100%; border: none;'>",
+    ]
+    for row in entry["matches"]:
+        home, away = row["Home Team"], row["Away Team"]
+        parts.append(
+            "<tr>"
+            f"<td style='{cell} width: 25%;'>{_logo_tag(home, logos)}{html.escape(home)}</td>"
+            f"<td style='{cell} width: 50%; font-size: 16px;'><b>{html.escape(row['Score'])}</b><br>"
+            f"<span style='font-size: 12px;'>{row['UTC Time']:%Y-%m-%d}</span></td>"
+            f"<td style='{cell} width: 25%;'>{_logo_tag(away, logos)}{html.escape(away)}</td>"
+            "</tr>"
+        )
+    parts.append("</table>")
+    return "".join(parts)
+
+
+def render_html(team, opponent):
+    """HTML block listing the pair's matches and `team`'s record, or None if they never met."""
+    state = _current()
+    key = (team, opponent)
+    instrumentation.count("head_to_head.html", hit=key in state["html"])
+    if key not in state["html"]:
+        entry = state["index"].get(pair_key(team, opponent))
+        state["html"][key] = _render(team, entry, state["logos"]) if entry else None
+    return state["html"][key]
@@ -0,0 +1,171 @@
+"""Opt-in timers and cache hit/miss counters for the app.
+
+Collection is off unless STD_INSTRUMENT=1 is set; then `timer()` and
+`count()` are a flag check and nothing else. When on, every data-loading
+step, derived-table build, figure build, image encode and story section
+reports here. View the numbers in the sidebar with `?debug=1` in the URL,
+or set STD_METRICS_FILE to a path ending in .json or .prom to have them
+exported (JSON or Prometheus text format) after every script run and
+every fragment rerun. The sidebar is redrawn on full reruns only, since a
+fragment cannot write to it.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+enabled = os.environ.get("STD_INSTRUMENT") == "1"
+METRICS_FILE = os.environ.get("STD_METRICS_FILE")
+# Recent runs kept per step for the median
+HISTORY = 200
+
+_lock = threading.Lock()
+_timers = {}
+_counters = {}
+_disabled = nullcontext()
+
+
+def observe(name, seconds):
+    """Add one timed run of `name`."""
+    if not enabled:
+        return
+    with _lock:
+        stats = _timers.get(name)
+        if stats is None:
+            stats = _timers[name] = {"count": 0, "total_s": 0.0, "max_s": 0.0, "last_s": 0.0,
+                                     "recent": deque(maxlen=HISTORY)}
+        stats["recent"].append(seconds)
+        stats["count"] += 1
+        stats["total_s"] += seconds
+        stats["max_s"] = max(stats["max_s"], seconds)
+        stats["last_s"] = seconds
+
+
+@contextmanager
+def _timer(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def timer(name):
+    """Context manager timing the block as `name`; a shared no-op when disabled."""
+    return _timer(name) if enabled else _disabled
+
+
+def count(cache, hit):
+    if not enabled:
+        return
+    key = (cache, "hit" if hit else "miss")
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + 1
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def snapshot():
+    with _lock:
+        timers = {name: dict(stats, recent=sorted(stats["recent"])) for name, stats in _timers.items()}
+        counters = dict(_counters)
+    for stats in timers.values():
+        recent = stats.pop("recent")
+        stats["p50_s"] = recent[len(recent) // 2]
+    caches = {}
+    for (cache, result), value in sorted(counters.items()):
+        caches.setdefault(cache, {"hit": 0, "miss": 0})[result] = value
+    return {"timers": dict(sorted(timers.items())), "caches": caches}
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=2)
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_prometheus():
+    data = snapshot()
+    lines = [
+        "# HELP std_step_seconds_total Time spent in an instrumented step.",
+        "# TYPE std_step_seconds_total counter",
+    ]
+    lines += [f'std_step_seconds_total{{step="{_label(n)}"}} {s["total_s"]:.6f}' for n, s in data["timers"].items()]
+    lines += ["# HELP std_step_runs_total Runs of an instrumented step.", "# TYPE std_step_runs_total counter"]
+    lines += [f'std_step_runs_total{{step="{_label(n)}"}} {s["count"]}' for n, s in data["timers"].items()]
+    lines += [f"# HELP std_step_p50_seconds Median of the last {HISTORY} runs of an instrumented step.",
+              "# TYPE std_step_p50_seconds gauge"]
+    lines += [f'std_step_p50_seconds{{step="{_label(n)}"}} {s["p50_s"]:.6f}' for n, s in data["timers"].items()]
+    lines += ["# HELP std_step_max_seconds Slowest run of an instrumented step.", "# TYPE std_step_max_seconds gauge"]
+    lines += [f'std_step_max_seconds{{step="{_label(n)}"}} {s["max_s"]:.6f}' for n, s in data["timers"].items()]
+    lines += ["# HELP std_cache_requests_total Cache lookups by result.", "# TYPE std_cache_requests_total counter"]
+    for cache, results in data["caches"].items():
+        for result, value in results.items():
+            lines.append(f'std_cache_requests_total{{cache="{_label(cache)}",result="{result}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def export(path):
+    """Write the current metrics to `path`: Prometheus text for .prom, JSON otherwise."""
+    text = to_prometheus() if path.endswith(".prom") else to_json()
+    # One temp file per call: sessions finishing at the same time each replace `path` whole
+    with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(os.path.abspath(path)), delete=False,
+                                     prefix=os.path.basename(path) + ".", suffix=".tmp") as f:
+        f.write(text)
+    try:
+        # NamedTemporaryFile is private (0600); keep the file readable by e.g. a textfile collector
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+    except OSError:
+        os.remove(f.name)
+        raise
+
+
+def render_sidebar():
+    import streamlit as st
+
+    sidebar = st.sidebar
+    sidebar.header("Debug: timings and caches")
+    if not enabled:
+        sidebar.write("Instrumentation is off. Start the app with STD_INSTRUMENT=1 to collect timings.")
+        return
+    data = snapshot()
+    sidebar.subheader("Steps")
+    sidebar.caption(f"section.* steps include fragment reruns; p50 is over the last {HISTORY} runs.")
+    sidebar.table([
+        {"step": name, "runs": s["count"], "last ms": round(s["last_s"] * 1000, 2),
+         "p50 ms": round(s["p50_s"] * 1000, 2), "max ms": round(s["max_s"] * 1000, 2),
+         "total ms": round(s["total_s"] * 1000, 1)}
+        for name, s in data["timers"].items()
+    ])
+    sidebar.subheader("Caches")
+    sidebar.table([{"cache": cache, **results} for cache, results in data["caches"].items()])
+    sidebar.download_button("metrics.json", to_json(), file_name="metrics.json", mime="application/json")
+    sidebar.download_button("metrics.prom", to_prometheus(), file_name="metrics.prom", mime="text/plain")
+
+
+def export_metrics():
+    """Export to STD_METRICS_FILE if it is set; run at the end of every script and fragment run."""
+    if enabled and METRICS_FILE:
+        try:
+            export(METRICS_FILE)
+        except OSError:
+            # Metrics are best effort; never let them break the page
+            logging.getLogger(__name__).warning("could not export metrics to %s", METRICS_FILE, exc_info=True)
+
+
+def after_run(debug=False):
+    """End-of-script hook: export to STD_METRICS_FILE and draw the debug sidebar."""
+    export_metrics()
+    if debug:
+        render_sidebar()
@@ -0,0 +1,60 @@
+"""The story's sections, each re-executable on its own.
+
+`@section(name)` marks a function that renders one part of the page, and
+`render(*sections)` runs them in the order given; the order lives in the
+script, so renaming or removing a section takes effect on the next run.
+`@fragment(name)` wraps a function in `st.fragment`, so widgets inside it
+rerun only that function instead of the whole script. With instrumentation
+on, every run of a section or fragment is timed as step "section.<name>",
+and a fragment exports the metrics when it finishes, so its reruns reach
+STD_METRICS_FILE. The debug sidebar picks them up on the next full rerun.
+"""
+import functools
+
+import streamlit as st
+
+import instrumentation
+
+
+def _timed(name, fn):
+    # Timed as step "section.<name>" in instrumentation; untouched when it is off
+    if not instrumentation.enabled:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        with instrumentation.timer(f"section.{name}"):
+            return fn(*args, **kwargs)
+
+    return run
+
+
+def section(name):
+    def wrap(fn):
+        return _timed(name, fn)
+
+    return wrap
+
+
+def fragment(name):
+    def wrap(fn):
+        if not instrumentation.enabled:
+            return st.fragment(fn)
+        timed = _timed(name, fn)
+
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            # A fragment rerun never reaches the after_run() call at the end of the script
+            try:
+                return timed(*args, **kwargs)
+            finally:
+                instrumentation.export_metrics()
+
+        return st.fragment(run)
+
+    return wrap
+
+
+def render(*sections):
+    for fn in sections:
+        fn()
@@ -0,0 +1,183 @@
+"""Local snapshot store for the Premier League 2023/24 dataset.
+
+Run `python snapshot.py ingest` once (with network, or `--from DIR` pointing at
+an already downloaded copy). The app then resolves its CSV paths from the
+store without touching kagglehub.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+DATASET = "whisperingkahuna/premier-league-2324-team-and-player-insights"
+STORE_DIR = os.environ.get(
+    "STD_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+)
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+
+# Files read by app.py, keyed by the variable name the app uses for them
+SOURCES = {
+    "pl_table": "pl_table_2023_24.csv",
+    "xg_data": "pl_table_xg_2023_24.csv",
+    "matches": "matches_23_24.csv",
+    "top_scorers": "Premleg_23_24/player_top_scorers.csv",
+    "top_assists": "Premleg_23_24/player_total_assists_in_attack.csv",
+    "possession_data": "Premleg_23_24/possession_percentage_team.csv",
+}
+# The app renders a fallback message when these are missing
+OPTIONAL = {"top_assists"}
+
+
+class SnapshotError(RuntimeError):
+    pass
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _download():
+    import kagglehub
+
+    import instrumentation
+
+    with instrumentation.timer("snapshot.kagglehub_download"):
+        return kagglehub.dataset_download(DATASET)
+
+
+def ingest(source=None, store=STORE_DIR):
+    """Copy the source CSVs into a new versioned snapshot and make it current."""
+    if source is None:
+        source = _download()
+
+    os.makedirs(store, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".ingest-", dir=store)
+    os.chmod(staging, 0o755)
+    try:
+        files = {}
+        for name, rel in SOURCES.items():
+            src = os.path.join(source, *rel.split("/"))
+            if not os.path.exists(src):
+                if name in OPTIONAL:
+                    continue
+                raise SnapshotError(f"{rel} not found in {source}")
+            dst = os.path.join(staging, *rel.split("/"))
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copyfile(src, dst)
+            files[name] = {"path": rel, "sha256": file_sha256(dst), "bytes": os.path.getsize(dst)}
+
+        # Content-addressed version: identical data always lands in the same directory
+        fingerprint = hashlib.sha256(
+            "".join(f"{f['path']}:{f['sha256']}\n" for f in sorted(files.values(), key=lambda f: f["path"])).encode()
+        ).hexdigest()
+        version = fingerprint[:12]
+        manifest = {
+            "dataset": DATASET,
+            "version": version,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "files": files,
+        }
+        with open(os.path.join(staging, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        target = os.path.join(store, version)
+        if os.path.exists(target):
+            shutil.rmtree(staging)
+        else:
+            os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    _set_current(version, store)
+    return version
+
+
+def _set_current(version, store):
+    tmp = os.path.join(store, CURRENT + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(store, CURRENT))
+
+
+def current_version(store=STORE_DIR):
+    try:
+        with open(os.path.join(store, CURRENT)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_manifest(version=None, store=STORE_DIR):
+    version = version or current_version(store)
+    if version is None:
+        raise SnapshotError(f"no snapshot in {store}; run `python snapshot.py ingest` first")
+    with open(os.path.join(store, version, MANIFEST)) as f:
+        return json.load(f)
+
+
+def verify(version=None, store=STORE_DIR):
+    """Return the names of files whose checksum no longer matches the manifest."""
+    manifest = load_manifest(version, store)
+    root = os.path.join(store, manifest["version"])
+    bad = []
+    for name, entry in manifest["files"].items():
+        path = os.path.join(root, *entry["path"].split("/"))
+        if not os.path.exists(path) or file_sha256(path) != entry["sha256"]:
+            bad.append(name)
+    return bad
+
+
+def resolve_paths(allow_download=None, store=STORE_DIR):
+    """Map each source name to a local file path.
+
+    Reads the current snapshot only. kagglehub is used when there is no
+    snapshot and `allow_download` (or STD_ALLOW_DOWNLOAD=1) is set.
+    """
+    if allow_download is None:
+        allow_download = os.environ.get("STD_ALLOW_DOWNLOAD") == "1"
+
+    if current_version(store) is not None:
+        manifest = load_manifest(store=store)
+        root = os.path.join(store, manifest["version"])
+    elif allow_download:
+        root = _download()
+    else:
+        raise SnapshotError(
+            f"no snapshot in {store}; run `python snapshot.py ingest` or set STD_ALLOW_DOWNLOAD=1"
+        )
+    return {name: os.path.join(root, *rel.split("/")) for name, rel in SOURCES.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_ingest = sub.add_parser("ingest", help="copy the dataset into a new snapshot")
+    p_ingest.add_argument("--from", dest="source", help="local dataset directory (default: kagglehub download)")
+    sub.add_parser("verify", help="check the current snapshot against its manifest")
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        version = ingest(args.source)
+        print(f"snapshot {version} is current ({os.path.join(STORE_DIR, version)})")
+        return 0
+
+    bad = verify()
+    if bad:
+        print("checksum mismatch: " + ", ".join(bad), file=sys.stderr)
+        return 1
+    print(f"snapshot {current_version()} OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""SeasonTimeline: incremental updates must match a full rebuild.
+
+Run from the repository root: python -m pytest tests
+"""
+import pandas as pd
+import pytest
+
+import timeline
+
+
+def matches(rows):
+    """(round, home, away, score[, kick-off]); kick-off defaults to the round's Saturday."""
+    frame = pd.DataFrame([row[:4] for row in rows], columns=["Round", "Home Team", "Away Team", "Score"])
+    frame.insert(1, "UTC Time", pd.to_datetime(
+        [row[4] if len(row) > 4 else SEASON_START + pd.Timedelta(weeks=row[0] - 1) for row in rows], utc=True))
+    return frame
+
+
+SEASON_START = pd.Timestamp("2023-08-12 14:00", tz="UTC")
+
+
+FIRST = matches([
+    (1, "A", "B", "2_0"), (1, "C", "D", "1 _ 1"),
+    (2, "A", "C", "1_0"), (2, "B", "D", "0 _ 3"),
+])
+LATER = matches([
+    (5, "B", "A", "4_0"), (5, "D", "C", "0_0"),
+    (3, "C", "B", "2_2"), (3, "D", "A", "1_0"),
+    (4, "A", "D", "0_0"), (4, "B", "C", "3_1"),
+])
+
+
+def full(frame):
+    return timeline.SeasonTimeline().update(frame)
+
+
+def incremental(frame, batches):
+    tl = timeline.SeasonTimeline()
+    for stop in batches:
+        tl.update(frame.iloc[:stop])
+    return tl.update(frame)
+
+
+def test_standings_after_each_round():
+    table = full(FIRST)
+    after_two = table[table["round"] == 2].set_index("team")
+    assert after_two["position"].to_dict() == {"A": 1, "D": 2, "C": 3, "B": 4}
+    assert after_two.loc["A", ["played", "points", "goal_difference"]].tolist() == [2, 6, 3]
+    assert after_two.loc["C", ["played", "points", "goal_difference"]].tolist() == [2, 1, -1]
+
+
+def test_append_after_skipped_rounds():
+    # Rounds 1-2 first, then a batch that starts at round 5
+    frame = pd.concat([FIRST, LATER.iloc[:2]], ignore_index=True)
+    table = incremental(frame, [len(FIRST)])
+    pd.testing.assert_frame_equal(table, full(frame))
+    after_five = table[table["round"] == 5]
+    assert (after_five["played"] == 3).all()
+    assert after_five["team"].tolist() == ["A", "D", "B", "C"]
+
+
+@pytest.mark.parametrize("batches", [[1, 2, 3, 4, 5, 6, 7, 8, 9], [4, 6], [2, 7], [0]])
+def test_out_of_order_batches_match_full_rebuild(batches):
+    frame = pd.concat([FIRST, LATER], ignore_index=True)
+    pd.testing.assert_frame_equal(incremental(frame, batches), full(frame))
+
+
+def test_team_appearing_later_reranks_earlier_rounds():
+    frame = pd.concat([FIRST, matches([(3, "E", "A", "0_5"), (1, "E", "B", "0_1")])], ignore_index=True)
+    table = incremental(frame, [len(FIRST)])
+    pd.testing.assert_frame_equal(table, full(frame))
+    assert set(table.loc[table["round"] == 1, "team"]) == {"A", "B", "C", "D", "E"}
+
+
+def test_changed_earlier_result_rebuilds():
+    frame = pd.concat([FIRST, LATER], ignore_index=True)
+    tl = timeline.SeasonTimeline()
+    tl.update(frame)
+    changed = frame.copy()
+    changed.loc[0, "Score"] = "0_4"
+    pd.testing.assert_frame_equal(tl.update(changed), full(changed))
+
+
+def test_unplayed_matches_are_skipped():
+    frame = pd.concat([FIRST, matches([(3, "A", "B", None), (3, "C", "D", "")])], ignore_index=True)
+    pd.testing.assert_frame_equal(incremental(frame, [2]), full(FIRST))
+
+
+def test_no_results_gives_empty_table():
+    frame = matches([(1, "A", "B", None), (1, "C", "D", "")])
+    table = full(frame)
+    assert table.empty
+    assert list(table.columns) == list(full(FIRST).columns)
+
+
+
+def test_rearranged_fixture_counts_when_played():
+    # A and B's round 1 match was postponed and played in the week of round 3
+    frame = matches([
+        (1, "A", "B", "2_0", "2023-08-30 19:45"), (1, "C", "D", "1_1"), (1, "E", "F", "0_1"),
+        (2, "A", "C", "1_0"), (2, "B", "E", "0_3"), (2, "D", "F", "2_2"),
+        (3, "A", "D", "1_1"), (3, "B", "F", "0_0"), (3, "C", "E", "3_1"),
+    ])
+    table = full(frame).set_index(["round", "team"])
+    assert table.loc[(1, "A"), "played"] == 0
+    assert table.loc[(2, "A"), ["played", "points"]].tolist() == [1, 3]
+    assert table.loc[(3, "A"), ["played", "points"]].tolist() == [3, 7]
+    pd.testing.assert_frame_equal(incremental(frame, [1, 3, 6]), full(frame))
+
+
+def test_kickoff_goes_to_nearest_round():
+    # Friday and Sunday games of a Saturday round stay in it; midweek games go to the nearer round
+    rounds = matches([(r, "A", "B", "1_0") for r in (1, 2, 3) for _ in range(5)])
+    moved = matches([(1, "C", "D", "0_0", t) for t in
+                     ("2023-08-18 19:00", "2023-08-20 16:30", "2023-08-23 19:45", "2023-08-24 19:45")])
+    frame = pd.concat([rounds, moved], ignore_index=True)
+    assert timeline.matchweeks(frame)[-4:].tolist() == [2, 2, 3, 3]
@@ -0,0 +1,202 @@
+"""League table after every matchweek, derived from the matches table.
+
+`SeasonTimeline` keeps per-team, per-round matrices of points, goals and
+matches played, filled with NumPy scatter-adds from a whole batch of
+results at once. Cumulative totals and table positions are recomputed
+only from the earliest round touched by the batch, so appending new
+results to matches_23_24.csv costs work proportional to the new rows and
+the remaining rounds, not to the whole season. Positions rank by points,
+goal difference, goals scored, then name.
+
+Results count in the matchweek they were played in, not the one they were
+scheduled for: each kick-off (UTC Time) goes to the round whose median
+kick-off is nearest, so a rearranged fixture moves to the week it actually
+happened. Rows without a kick-off time keep their scheduled round.
+
+`load()` returns the long-format table for the current dataset, shared by
+every session and brought up to date whenever the matches file changes.
+"""
+import threading
+
+import datastore
+import derived
+import instrumentation
+
+ROUND = "Round"
+KICKOFF = "UTC Time"
+# Columns identifying a result; a change to an already-processed row means a full rebuild
+RESULT_COLUMNS = [ROUND, KICKOFF, "Home Team", "Away Team", "Score"]
+
+
+def matchweeks(matches):
+    """Round (1-based, float, NaN if unknown) in which each match was played, by kick-off time."""
+    import numpy as np
+    import pandas as pd
+
+    kickoff = pd.to_datetime(matches[KICKOFF], utc=True)
+    seconds = (kickoff - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy()
+    scheduled = matches[ROUND].astype("float64").to_numpy()
+    centres = pd.Series(seconds).groupby(scheduled).median().dropna()
+    if centres.empty:
+        return scheduled
+    # Boundaries halfway between consecutive rounds' median kick-offs
+    middle = np.maximum.accumulate(centres.to_numpy())
+    nearest = centres.index.to_numpy()[np.searchsorted((middle[:-1] + middle[1:]) / 2, seconds, side="right")]
+    return np.where(np.isnan(seconds), scheduled, nearest)
+
+
+class SeasonTimeline:
+    """Cumulative points, goal difference and position per team after each round of one season."""
+
+    def __init__(self):
+        import numpy as np
+
+        self.teams = []
+        self._team_index = {}
+        self._hashes = np.empty(0, dtype="uint64")
+        self._weeks = np.empty(0, dtype="float64")
+        # Per (team, round) increments, and their running totals along the rounds axis
+        self._inc = {key: np.zeros((0, 0), dtype="int32") for key in ("points", "gf", "ga", "played")}
+        self._cum = {key: values.copy() for key, values in self._inc.items()}
+        self._position = np.zeros((0, 0), dtype="int16")
+        self.table = self._long_table()
+
+    def update(self, matches):
+        """Fold in rows of `matches` not seen yet; rebuild if earlier rows changed."""
+        import numpy as np
+        import pandas as pd
+
+        hashes = pd.util.hash_pandas_object(matches[RESULT_COLUMNS], index=False).to_numpy()
+        # New fixtures can move the matchweek boundaries under rows already counted
+        weeks = matchweeks(matches)
+        seen = len(self._hashes)
+        if (len(hashes) < seen or not np.array_equal(hashes[:seen], self._hashes)
+                or not np.array_equal(weeks[:seen], self._weeks, equal_nan=True)):
+            self.__init__()
+            seen = 0
+        self._hashes = hashes
+        self._weeks = weeks
+        if len(matches) > seen:
+            self._add(matches.iloc[seen:], weeks[seen:])
+        return self.table
+
+    def _indices(self, names):
+        import numpy as np
+        import pandas as pd
+
+        for name in np.unique(names):
+            if name not in self._team_index:
+                self._team_index[name] = len(self.teams)
+                self.teams.append(name)
+        return pd.Index(self.teams).get_indexer(names)
+
+    def _grow(self, teams, rounds):
+        """Pad the matrices to `teams` x `rounds`; the new cells are filled by _accumulate."""
+        import numpy as np
+
+        old_teams, old_rounds = self._inc["points"].shape
+        if teams <= old_teams and rounds <= old_rounds:
+            return
+        pad = ((0, max(teams - old_teams, 0)), (0, max(rounds - old_rounds, 0)))
+        self._inc = {key: np.pad(values, pad) for key, values in self._inc.items()}
+        self._cum = {key: np.pad(values, pad) for key, values in self._cum.items()}
+        self._position = np.pad(self._position, pad)
+
+    def _add(self, matches, weeks):
+        import numpy as np
+
+        goals = derived.parse_goals(matches["Score"])
+        played = goals[0].notna().to_numpy() & ~np.isnan(weeks)
+        if not played.any():
+            return
+        home_goals = goals.loc[played, 0].to_numpy("int32")
+        away_goals = goals.loc[played, 1].to_numpy("int32")
+        rounds = weeks[played].astype("int64") - 1
+        known_teams = len(self.teams)
+        known_rounds = self._inc["points"].shape[1]
+        home = self._indices(matches.loc[played, "Home Team"].astype(str).to_numpy(object))
+        away = self._indices(matches.loc[played, "Away Team"].astype(str).to_numpy(object))
+        self._grow(len(self.teams), int(rounds.max()) + 1)
+
+        home_points = np.where(home_goals > away_goals, 3, np.where(home_goals == away_goals, 1, 0))
+        away_points = np.where(away_goals > home_goals, 3, np.where(home_goals == away_goals, 1, 0))
+        teams = np.concatenate([home, away])
+        at = (teams, np.concatenate([rounds, rounds]))
+        np.add.at(self._inc["points"], at, np.concatenate([home_points, away_points]))
+        np.add.at(self._inc["gf"], at, np.concatenate([home_goals, away_goals]))
+        np.add.at(self._inc["ga"], at, np.concatenate([away_goals, home_goals]))
+        np.add.at(self._inc["played"], at, 1)
+        # A new team changes every earlier table it was missing from. Rounds padded
+        # in by _grow start at zero and must be carried forward from the last known one.
+        self._accumulate(0 if len(self.teams) > known_teams else min(int(rounds.min()), known_rounds))
+
+    def _accumulate(self, start):
+        """Recompute running totals and positions for rounds >= `start` (0-based)."""
+        import numpy as np
+
+        for key, inc in self._inc.items():
+            cum = self._cum[key]
+            cum[:, start:] = np.cumsum(inc[:, start:], axis=1)
+            if start:
+                cum[:, start:] += cum[:, start - 1:start]
+
+        points = self._cum["points"][:, start:].astype("int64")
+        gd = (self._cum["gf"] - self._cum["ga"])[:, start:].astype("int64")
+        gf = self._cum["gf"][:, start:].astype("int64")
+        n = len(self.teams)
+        # Names break remaining ties, alphabetically first ranks higher
+        name_rank = np.argsort(np.argsort(np.array(self.teams, dtype=object), kind="stable"))[:, None]
+        key = ((points * 4096 + gd + 2048) * 4096 + gf) * n + (n - 1 - name_rank)
+        order = np.argsort(-key, axis=0, kind="stable")
+        position = np.empty_like(order)
+        np.put_along_axis(position, order, np.arange(1, n + 1)[:, None], axis=0)
+        self._position[:, start:] = position
+        self.table = self._long_table()
+
+    def _long_table(self):
+        import numpy as np
+        import pandas as pd
+
+        # Only rounds with at least one result
+        rounds = np.flatnonzero(self._inc["played"].any(axis=0))
+        n = len(self.teams)
+        table = pd.DataFrame({
+            "team": pd.Categorical(np.repeat(np.array(self.teams, dtype=object), len(rounds))),
+            "round": np.tile(rounds + 1, n).astype("int16"),
+            "played": self._cum["played"][:, rounds].ravel().astype("int16"),
+            "points": self._cum["points"][:, rounds].ravel().astype("int16"),
+            "goals_for": self._cum["gf"][:, rounds].ravel().astype("int16"),
+            "goals_against": self._cum["ga"][:, rounds].ravel().astype("int16"),
+            "position": self._position[:, rounds].ravel().astype("int8"),
+        })
+        table.insert(6, "goal_difference", table["goals_for"] - table["goals_against"])
+        return table.sort_values(["round", "position"], kind="stable", ignore_index=True)
+
+
+_lock = threading.Lock()
+_timeline = None
+_source = None
+
+
+def load():
+    """Copy-on-write view of (team, round, played, points, goals, goal_difference, position)."""
+    global _timeline, _source
+    current = (datastore.paths()["matches"], datastore.stamp("matches"))
+    if _source == current:
+        instrumentation.count("timeline", hit=True)
+        return datastore.view(_timeline.table)
+    instrumentation.count("timeline", hit=False)
+    with _lock:
+        if _source != current:
+            if _timeline is None:
+                _timeline = SeasonTimeline()
+            with instrumentation.timer("timeline.update"):
+                _timeline.update(datastore.load("matches"))
+            _source = current
+    return datastore.view(_timeline.table)
+
+
+def clear():
+    global _timeline, _source
+    with _lock:
+        _timeline = _source = None
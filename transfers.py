@@ -0,0 +1,245 @@
+"""Transfer history per league, from the CSVs in data/ (e.g. 1-bundesliga.csv).
+
+Each league file is converted once, CHUNKSIZE rows at a time, to a compact
+Parquet copy next to it: categorical clubs, positions and leagues, integer
+years, and `fee_cleaned` as float32 millions of euros, with raw fee strings
+like "€150Th." parsed only where the source left `fee_cleaned` empty. While
+streaming, each chunk is also folded into a small spend summary per
+(league, club, year, movement), written alongside.
+
+Only the summaries stay in memory, indexed by club and by season, so
+`spend()` filters without scanning rows and memory grows with clubs x
+seasons rather than with the number of transfers. Row-level `transfers()`
+reads just the matching rows from Parquet. Run `python transfers.py` to
+convert every league file ahead of time.
+"""
+import glob
+import os
+import threading
+
+import datastore
+import instrumentation
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CHUNKSIZE = 50_000
+
+DTYPES = {
+    "club_name": "category", "player_name": "string", "age": "Int8", "position": "category",
+    "club_involved_name": "category", "fee": "category", "transfer_movement": "category",
+    "transfer_period": "category", "fee_cleaned": "float32", "league_name": "category",
+    "year": "int16", "season": "category",
+}
+# "€150Th.", "€1.50m", "Loan fee:€500Th." -> millions of euros
+FEE_PATTERN = r"€\s*(?P<amount>\d+(?:[.,]\d+)?)\s*(?P<unit>Th\.|k|m|bn)"
+FEE_UNITS = {"Th.": 0.001, "k": 0.001, "m": 1.0, "bn": 1000.0}
+SUMMARY_KEYS = ["league_name", "club_name", "year", "transfer_movement"]
+
+_lock = threading.Lock()
+_state = {"stamps": None}
+
+
+def files():
+    """League CSVs under DATA_DIR, sorted by name."""
+    return sorted(glob.glob(os.path.join(DATA_DIR, "*.csv")))
+
+
+def _parquet_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def _summary_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".spend.parquet"
+
+
+def parse_fees(fee):
+    """Millions of euros for each raw fee string; 0 for free transfers, NaN when unknown."""
+    pd = datastore.import_pandas()
+
+    # Parsed per distinct string, then mapped back through the category codes
+    fee = fee.astype("category")
+    categories = pd.Series(fee.cat.categories.astype(str))
+    parts = categories.str.extract(FEE_PATTERN)
+    values = parts["amount"].str.replace(",", ".").astype("float64") * parts["unit"].map(FEE_UNITS)
+    values = values.where(categories.str.casefold() != "free transfer", 0.0).to_numpy("float32")
+    codes = fee.cat.codes.to_numpy()
+    return pd.Series(values.take(codes), index=fee.index).where(codes >= 0)
+
+
+def _normalize(chunk):
+    missing = chunk["fee_cleaned"].isna()
+    if missing.any():
+        chunk.loc[missing, "fee_cleaned"] = parse_fees(chunk.loc[missing, "fee"])
+    return chunk
+
+
+def _summarize(chunk):
+    paid = chunk["fee_cleaned"].notna()
+    return (
+        chunk.assign(spend=chunk["fee_cleaned"].astype("float64"), paid=paid)
+        .groupby(SUMMARY_KEYS, observed=True)
+        .agg(spend=("spend", "sum"), transfers=("spend", "size"), paid=("paid", "sum"))
+        .reset_index()
+    )
+
+
+def _compact(summary):
+    pd = datastore.import_pandas()
+
+    summary = summary.groupby(SUMMARY_KEYS, observed=True, as_index=False)[["spend", "transfers", "paid"]].sum()
+    for col in ("league_name", "club_name", "transfer_movement"):
+        summary[col] = summary[col].astype(str).astype("category")
+    summary = summary.astype({"year": "int16", "transfers": "int32", "paid": "int32"})
+    summary = summary.sort_values(["club_name", "year"], kind="stable", ignore_index=True)
+    summary["season"] = pd.Categorical(summary["year"].astype(str) + "/" + (summary["year"] + 1).astype(str))
+    return summary
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    # Fixed index width, so every chunk's categoricals map to the same file schema
+    types = {"category": pa.dictionary(pa.int32(), pa.string()), "string": pa.string(), "Int8": pa.int8(),
+             "float32": pa.float32(), "int16": pa.int16()}
+    return pa.schema([(col, types[dtype]) for col, dtype in DTYPES.items()])
+
+
+def convert(csv_path, chunksize=CHUNKSIZE):
+    """Stream `csv_path` into its compact Parquet copy and spend summary; returns the summary."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pd = datastore.import_pandas()
+    schema = _arrow_schema()
+    target = _parquet_path(csv_path)
+    name = os.path.basename(csv_path)
+    writer = None
+    partials = []
+    with instrumentation.timer(f"transfers.convert.{name}"):
+        try:
+            for chunk in pd.read_csv(csv_path, dtype=DTYPES, usecols=list(DTYPES), chunksize=chunksize):
+                chunk = _normalize(chunk)
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(target + ".tmp", table.schema)
+                writer.write_table(table)
+                partials.append(_summarize(chunk))
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is not None:
+            os.replace(target + ".tmp", target)
+        summary = _compact(pd.concat(partials, ignore_index=True)) if partials else None
+    if summary is not None:
+        summary.to_parquet(_summary_path(csv_path) + ".tmp", index=False)
+        os.replace(_summary_path(csv_path) + ".tmp", _summary_path(csv_path))
+    return summary
+
+
+def _load_summary(csv_path):
+    pd = datastore.import_pandas()
+    path = _summary_path(csv_path)
+    try:
+        if os.stat(path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns:
+            return pd.read_parquet(path)
+    except FileNotFoundError:
+        pass
+    return convert(csv_path)
+
+
+def _positions(values):
+    """{value: sorted row positions} for a column of the summary."""
+    import numpy as np
+
+    codes, uniques = values.factorize(sort=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)}
+
+
+def _build_state(paths):
+    pd = datastore.import_pandas()
+
+    summaries = [s for s in (_load_summary(p) for p in paths) if s is not None]
+    if not summaries:
+        return {"summary": None, "club": {}, "year": {}, "league": {}}
+    summary = _compact(pd.concat(summaries, ignore_index=True))
+    return {
+        "summary": summary,
+        "club": _positions(summary["club_name"].astype(str)),
+        "year": _positions(summary["year"]),
+        "league": _positions(summary["league_name"].astype(str)),
+    }
+
+
+def _current():
+    global _state
+    paths = files()
+    stamps = tuple((p, os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in paths)
+    if _state["stamps"] == stamps:
+        instrumentation.count("transfers", hit=True)
+        return _state
+    instrumentation.count("transfers", hit=False)
+    with _lock:
+        if _state["stamps"] != stamps:
+            with instrumentation.timer("transfers.build_index"):
+                # Swapped in whole, so concurrent sessions never see a half-built index
+                _state = dict(_build_state(paths), stamps=stamps)
+    return _state
+
+
+def clubs():
+    return sorted(_current()["club"])
+
+
+def seasons():
+    return sorted(_current()["year"])
+
+
+def spend(club=None, season=None, league=None, movement=None):
+    """Spend per (league, club, year, movement) in millions of euros, filtered by the given keys.
+
+    `season` is the starting year (2023 for 2023/24). `spend` sums the known
+    fees, `transfers` counts all moves and `paid` those with a known fee.
+    """
+    import numpy as np
+
+    state = _current()
+    summary = state["summary"]
+    if summary is None:
+        return None
+    selected = None
+    for index, value in (("club", club), ("year", season), ("league", league)):
+        if value is None:
+            continue
+        rows = state[index].get(value, np.empty(0, dtype=np.intp))
+        selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+    result = summary if selected is None else summary.take(np.sort(selected))
+    if movement is not None:
+        result = result[result["transfer_movement"] == movement]
+    return datastore.view(result)
+
+
+def transfers(club=None, season=None, league=None, columns=None):
+    """Individual transfers matching the filters, read from the Parquet copies only as needed."""
+    pd = datastore.import_pandas()
+
+    _current()  # converts any new or changed league file
+    filters = [(col, "==", value) for col, value in
+               (("club_name", club), ("year", season), ("league_name", league)) if value is not None]
+    frames = []
+    for csv_path in files():
+        frame = pd.read_parquet(_parquet_path(csv_path), columns=columns, filters=filters or None)
+        if len(frame):
+            frames.append(frame)
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def build_all():
+    for csv_path in files():
+        convert(csv_path)
+
+
+if __name__ == "__main__":
+    build_all()